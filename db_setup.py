@@ -1,7 +1,10 @@
 import sqlite3
 import random
+import sys
 from datetime import datetime, timedelta
 
+from fts_index import create_fts_indexes
+
 # Step 1: Create SQLite database
 db_path = "my_database.db"
 conn = sqlite3.connect(db_path)
@@ -126,6 +129,11 @@ review_comments = ["Great product!", "Not satisfied.", "Value for money.", "Woul
 review_data = [(random.randint(1, 70), random.randint(1, 70), random.randint(1, 5), random.choice(review_comments)) for _ in range(70)]
 cursor.executemany("INSERT OR IGNORE INTO Reviews (CustomerID, ProductID, Rating, Comment) VALUES (?, ?, ?, ?)", review_data)
 
+# Step 3b (optional): FTS5 shadow indexes for free-text questions, kept in sync
+# by triggers. Enable with: python db_setup.py --fts
+if "--fts" in sys.argv:
+    create_fts_indexes(conn)
+
 # Step 4: Verify that tables were created
 cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
 tables = cursor.fetchall()
@@ -0,0 +1,291 @@
+import re
+import sqlite3
+
+# Text columns from the db_setup.py schema that get an FTS5 shadow index, keyed
+# by table name with the table's rowid alias first.
+FTS_COLUMNS = {
+    "Customers": ("CustomerID", ["Name", "Email", "City"]),
+    "Categories": ("CategoryID", ["CategoryName"]),
+    "Products": ("ProductID", ["Name"]),
+    "Shippers": ("ShipperID", ["Name"]),
+    "Reviews": ("ReviewID", ["Comment"]),
+}
+
+# The trigram tokenizer indexes every 3-character substring, so a MATCH on a
+# phrase finds the same rows as LIKE '%phrase%' (case-insensitively) for any
+# literal of 3 or more characters.
+MIN_MATCH_LENGTH = 3
+
+# A MATCH lookup only beats a scan when the term is selective: for a term found
+# in a large share of rows, fetching each match by rowid is slower than the
+# LIKE scan (about 2x for a term in ~30% of rows, see fts_benchmark.py). Terms
+# estimated to match more than this fraction of a table are left as LIKE.
+MAX_MATCH_FRACTION = 0.05
+
+# Trigrams looked up in the vocabulary when estimating selectivity. Each lookup
+# reads that trigram's doclist, so common terms get expensive to probe.
+SELECTIVITY_PROBES = 3
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def create_fts_indexes(conn, tables=None):
+    """Create FTS5 shadow indexes plus sync triggers and populate them from the base tables."""
+    for table in tables or FTS_COLUMNS:
+        key, columns = FTS_COLUMNS[table]
+        fts = fts_table(table)
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+
+        # External content table: the index stores no copy of the text, and the
+        # triggers below keep it in step with every write to the base table.
+        # The vocab table exposes per-trigram document counts for the
+        # selectivity check in rewrite_like_to_match.
+        conn.executescript(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {cols}, content='{table}', content_rowid='{key}', tokenize='trigram'
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}_vocab USING fts5vocab({fts}, 'row');
+
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new_cols});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old_cols});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old_cols});
+                INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new_cols});
+            END;
+
+            INSERT INTO {fts} ({fts}) VALUES ('rebuild');
+        """)
+    conn.commit()
+
+
+def drop_fts_indexes(conn, tables=None):
+    for table in tables or FTS_COLUMNS:
+        fts = fts_table(table)
+        conn.executescript(f"""
+            DROP TRIGGER IF EXISTS {fts}_ai;
+            DROP TRIGGER IF EXISTS {fts}_ad;
+            DROP TRIGGER IF EXISTS {fts}_au;
+            DROP TABLE IF EXISTS {fts}_vocab;
+            DROP TABLE IF EXISTS {fts};
+        """)
+    conn.commit()
+
+
+def indexed_tables(conn):
+    names = {row[0].lower() for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [table for table in FTS_COLUMNS
+            if fts_table(table).lower() in names and f"{fts_table(table)}_vocab".lower() in names]
+
+
+def _mask(sql):
+    # Blank out string literal bodies and comments (keeping every offset) so the
+    # patterns below never match inside them. Returns None for unterminated
+    # literals or comments.
+    out = list(sql)
+    i = 0
+    while i < len(sql):
+        if sql[i] == "'":
+            j = i + 1
+            while True:
+                j = sql.find("'", j)
+                if j < 0:
+                    return None
+                if sql.startswith("''", j):
+                    j += 2
+                    continue
+                break
+            out[i + 1:j] = " " * (j - i - 1)
+            i = j + 1
+        elif sql.startswith("--", i):
+            j = sql.find("\n", i)
+            j = len(sql) if j < 0 else j
+            out[i:j] = " " * (j - i)
+            i = j
+        elif sql.startswith("/*", i):
+            j = sql.find("*/", i + 2)
+            if j < 0:
+                return None
+            out[i:j + 2] = " " * (j + 2 - i)
+            i = j + 2
+        else:
+            i += 1
+    return "".join(out)
+
+
+# Column reference: optional qualifier then column name, e.g. r.Comment or Name.
+_COLUMN = r'(?:(?P<qual>\w+)\s*\.\s*)?"?(?P<col>\w+)"?'
+# Literals are matched on masked text, where their bodies contain no quotes.
+_LITERAL = r"'(?P<lit>[^']*)'"
+_LIKE = re.compile(rf"(?<![\w.]){_COLUMN}\s+(?P<not>NOT\s+)?LIKE\s+{_LITERAL}", re.I)
+# instr() returns a position, so only the "contains" comparisons are eligible.
+_INSTR = re.compile(rf"(?<![\w.])INSTR\s*\(\s*{_COLUMN}\s*,\s*{_LITERAL}\s*\)\s*(?:>|!=|<>)\s*0(?![\w.])", re.I)
+# Table references in the FROM clause, including comma joins.
+_FROM_CLAUSE = re.compile(r"\bFROM\b(.*?)(?=\b(?:WHERE|GROUP|ORDER|LIMIT|WINDOW|HAVING)\b|$)", re.I | re.S)
+_TABLE_REF = re.compile(r"(?:\b(?:FROM|JOIN)\s+|,\s*)\"?(\w+)\"?(?:\s+(?:AS\s+)?(\w+))?", re.I)
+_NOT_ALIAS = {"where", "join", "inner", "left", "right", "cross", "natural", "on", "using",
+              "group", "order", "limit", "union", "except", "intersect", "as", "full", "outer",
+              "not", "indexed", "window", "having"}
+_TOKEN_LEFT = re.compile(r"(\w+|\S)\s*$")
+_TOKEN_RIGHT = re.compile(r"\s*(\w+|\S)")
+
+# Tokens that may sit next to a predicate that filters rows. Between these the
+# predicate's value is only ever tested for truth, so the rewrite returning
+# FALSE where LIKE returns NULL (a NULL column) cannot change the result.
+_FILTER_BEFORE = {"WHERE", "ON", "AND", "OR", "("}
+_FILTER_AFTER = {"AND", "OR", "GROUP", "ORDER", "LIMIT", "WINDOW", "WHERE", ";", ")", "",
+                 "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "NATURAL"}
+
+
+def _is_boolean_operand(masked, start, end):
+    match = _TOKEN_LEFT.search(masked, 0, start)
+    before = match.group(1).upper() if match else ""
+    if before not in _FILTER_BEFORE:
+        return False
+    if before == "AND":
+        # The AND of "x BETWEEN a AND b" is not a boolean operator.
+        previous = re.findall(r"\b(AND|OR|WHERE|ON|BETWEEN)\b", masked[:match.start(1)], re.I)
+        if previous and previous[-1].upper() == "BETWEEN":
+            return False
+    match = _TOKEN_RIGHT.match(masked, end)
+    return (match.group(1).upper() if match else "") in _FILTER_AFTER
+
+
+def _is_filter_operand(masked, start, end):
+    # The predicate, and every parenthesised group enclosing it, must sit
+    # between WHERE/ON/AND/OR/( on the left and AND/OR/)/a clause boundary on
+    # the right. Anything else around any level (NOT, IS, comparisons, ||,
+    # COLLATE, ESCAPE, CASE, function calls) could observe NULL vs FALSE.
+    if not _is_boolean_operand(masked, start, end):
+        return False
+    depth = 0
+    for i in range(start - 1, -1, -1):
+        if masked[i] == ")":
+            depth += 1
+        elif masked[i] == "(" and depth:
+            depth -= 1
+        elif masked[i] == "(":
+            # Find the matching close of this enclosing group.
+            inner, j = 1, end
+            while inner and j < len(masked):
+                inner += {"(": 1, ")": -1}.get(masked[j], 0)
+                j += 1
+            if inner or not _is_boolean_operand(masked, i, j):
+                return False
+            end = j
+    return True
+
+
+def _table_refs(masked, tables):
+    # Map every name a table can be referred to by (table name or alias) to
+    # (table, qualifier used to reach its rowid column).
+    canonical = {t.lower(): t for t in tables}
+    refs = {}
+    clause = _FROM_CLAUSE.search(masked)
+    for name, alias in _TABLE_REF.findall("FROM " + clause.group(1) if clause else ""):
+        table = canonical.get(name.lower())
+        if table is None:
+            continue
+        if alias and alias.lower() not in _NOT_ALIAS:
+            refs[alias.lower()] = (table, alias)
+        else:
+            refs[name.lower()] = (table, name)
+    return refs
+
+
+def _literal_runs(literal):
+    # Each run of 3+ literal characters between LIKE wildcards becomes a phrase;
+    # shorter runs cannot be looked up in a trigram index and are left to the
+    # recheck of the original predicate.
+    return [r for r in re.split(r"[%_]", literal) if len(r) >= MIN_MATCH_LENGTH]
+
+
+def _match_query(column, runs):
+    phrases = " AND ".join('"' + r.replace('"', '""') + '"' for r in runs)
+    return f"{column} : ({phrases})".replace("'", "''")
+
+
+def _is_selective(conn, table, runs, max_match_fraction=MAX_MATCH_FRACTION):
+    # A row matches only if it contains every trigram of every run, so the
+    # rarest trigram bounds the number of matches. Probe a few spread across
+    # the term rather than all of them.
+    key = FTS_COLUMNS[table][0]
+    rows = conn.execute(f"SELECT MAX({key}) FROM {table}").fetchone()[0] or 0
+    trigrams = [run[i:i + 3].lower() for run in runs for i in range(len(run) - 2)]
+    step = max(1, (len(trigrams) - 1) // max(1, SELECTIVITY_PROBES - 1))
+    for trigram in trigrams[::step][:SELECTIVITY_PROBES]:
+        found = conn.execute(f"SELECT doc FROM {fts_table(table)}_vocab WHERE term = ?", (trigram,)).fetchone()
+        if found is None or found[0] <= rows * max_match_fraction:
+            return True
+    return False
+
+
+def rewrite_like_to_match(sql, conn, max_match_fraction=MAX_MATCH_FRACTION):
+    """Rewrite LIKE/instr text predicates in sql into FTS5 MATCH lookups where an index exists.
+
+    Only single-SELECT statements (no subqueries, derived tables or CTEs, and
+    no INDEXED BY / NOT INDEXED plan pinning) are touched, and only predicates
+    that filter rows in WHERE/ON through AND/OR alone. Tables are resolved from
+    the FROM clause, comma joins included. Each predicate is kept as a recheck
+    next to a rowid IN (... MATCH ...) semi-join, so the rewritten statement
+    returns the same rows. Terms estimated to match more than
+    max_match_fraction of a table are left alone.
+    """
+    tables = indexed_tables(conn)
+    if not tables:
+        return sql
+    masked = _mask(sql)
+    if (masked is None or re.match(r"\s*WITH\b", masked, re.I)
+            or len(re.findall(r"\bSELECT\b", masked, re.I)) != 1
+            or re.search(r"\bINDEXED\b", masked, re.I)):
+        return sql
+    refs = _table_refs(masked, tables)
+
+    def resolve(qual, col):
+        if qual:
+            ref = refs.get(qual.lower())
+            candidates = [ref] if ref else []
+        else:
+            candidates = list(dict.fromkeys(refs.values()))
+        candidates = [(t, q) for t, q in candidates
+                      if col.lower() in (c.lower() for c in FTS_COLUMNS[t][1])]
+        # A bare column shared by several joined tables is ambiguous; leave it.
+        return candidates[0] if len(candidates) == 1 else None
+
+    def rewrite(match):
+        if match.groupdict().get("not") or not _is_filter_operand(masked, match.start(), match.end()):
+            return None
+        resolved = resolve(match.group("qual"), match.group("col"))
+        if resolved is None:
+            return None
+        table, qual = resolved
+        # instr() treats % and _ literally; splitting its argument on them anyway
+        # only loosens the MATCH prefilter, and the recheck keeps the result exact.
+        runs = _literal_runs(sql[match.start("lit"):match.end("lit")].replace("''", "'"))
+        if not runs or not _is_selective(conn, table, runs, max_match_fraction):
+            return None
+        column = next(c for c in FTS_COLUMNS[table][1] if c.lower() == match.group("col").lower())
+        fts = fts_table(table)
+        key = FTS_COLUMNS[table][0]
+        return (f"({qual}.{key} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH '{_match_query(column, runs)}')"
+                f" AND {sql[match.start():match.end()]})")
+
+    edits = []
+    for pattern in (_LIKE, _INSTR):
+        for match in pattern.finditer(masked):
+            replacement = rewrite(match)
+            if replacement is not None:
+                edits.append((match.start(), match.end(), replacement))
+    for start, end, replacement in sorted(edits, reverse=True):
+        sql = sql[:start] + replacement + sql[end:]
+    return sql
@@ -437,6 +437,7 @@
       "source": [
         "import streamlit as st\n",
         "import sqlite3\n",
+        "from query_profiler import profiled_execute\n",
         "\n",
         "# Streamlit UI\n",
         "st.title(\"Intelligent Database Agent\")\n",
@@ -452,9 +453,8 @@
         "    # Execute SQL\n",
         "    try:\n",
         "        conn = sqlite3.connect(\"company_db.db\")\n",
-        "        cursor = conn.cursor()\n",
-        "        cursor.execute(sql_query)\n",
-        "        results = cursor.fetchall()\n",
+        "        # Runs through the profiler so expensive statements land in the slow query log\n",
+        "        results = profiled_execute(conn, sql_query, nl_question=nl_query)\n",
         "        conn.close()\n",
         "\n",
         "        # Display results\n",
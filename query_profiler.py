@@ -0,0 +1,211 @@
+import argparse
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+# Default location of the slow query log. It lives in its own database file so
+# logging never touches (or locks) the database the generated SQL runs against.
+SLOW_LOG_PATH = "slow_query_log.db"
+
+# VM instructions between progress handler callbacks. Lower values give finer
+# step counts at the cost of more Python callbacks per statement.
+PROGRESS_INTERVAL = 100
+
+# A statement is logged when it exceeds either threshold.
+SLOW_STEPS = 100_000
+SLOW_MS = 200.0
+
+# Number of entries kept in the log table; older ones are rotated out.
+MAX_LOG_ENTRIES = 1000
+
+
+_LITERAL_OR_COMMENT = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.S)
+_TABLE_REF = re.compile(r"(?:\b(?:FROM|JOIN)\s+|,\s*)\"?(\w+)\"?(?:\s+(?:AS\s+)?(\w+))?", re.I)
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape so literal-only variations group together."""
+    # One pass, so a literal like 'a--b' is not mistaken for a comment.
+    shape = _LITERAL_OR_COMMENT.sub(lambda m: "?" if m.group().startswith("'") else " ", sql)
+    shape = re.sub(r"\b\d+(?:\.\d+)?\b", "?", shape)
+    shape = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(?)", shape)
+    shape = re.sub(r"\s+", " ", shape).strip().rstrip(";").strip()
+    return shape.upper()
+
+
+def init_slow_log(log_path=SLOW_LOG_PATH):
+    conn = sqlite3.connect(log_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS slow_queries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            logged_at TEXT NOT NULL,
+            nl_question TEXT,
+            sql_text TEXT NOT NULL,
+            sql_shape TEXT NOT NULL,
+            traced_sql TEXT,
+            vm_steps INTEGER NOT NULL,
+            elapsed_ms REAL NOT NULL,
+            rows_scanned INTEGER,
+            rows_returned INTEGER NOT NULL,
+            query_plan TEXT
+        );
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_slow_queries_shape ON slow_queries (sql_shape);")
+    conn.commit()
+    return conn
+
+
+def explain_query_plan(conn, sql, params=()):
+    # EXPLAIN QUERY PLAN rows are (id, parent, notused, detail); indent each
+    # detail line by its depth in the plan tree.
+    try:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + sql.strip().rstrip(";"), params).fetchall()
+    except sqlite3.Error as e:
+        return [], f"(no plan: {e})"
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return rows, "\n".join(lines)
+
+
+def table_row_count(conn, table):
+    # Prefer the row count ANALYZE left in sqlite_stat1; without it fall back to
+    # COUNT(*), which is itself a scan of the table (or its smallest index).
+    try:
+        stat = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,)).fetchone()
+    except sqlite3.Error:
+        stat = None
+    if stat:
+        return int(stat[0].split()[0])
+    return conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+
+def estimate_rows_scanned(conn, sql, plan_rows):
+    # SQLite does not report rows visited per statement, so estimate it from the
+    # plan: every full scan of a table or one of its indexes ("SCAN ...", as
+    # opposed to "SEARCH ...") visits the whole table. Plans name the alias when
+    # there is one (SCAN r), so map aliases back to tables via the FROM clause.
+    tables = {row[0].lower(): row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    aliases = {}
+    for name, alias in _TABLE_REF.findall(_LITERAL_OR_COMMENT.sub("?", sql)):
+        if name.lower() in tables and alias:
+            aliases[alias.lower()] = tables[name.lower()]
+
+    counts = {}
+    total = 0
+    for _, _, _, detail in plan_rows:
+        match = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+        # FTS5 lookups show up as scans of a virtual table; they are not full scans.
+        if not match or "VIRTUAL TABLE" in detail:
+            continue
+        name = match.group(1).lower()
+        # Anything else is a CTE, subquery or constant row rather than a table.
+        table = aliases.get(name) or tables.get(name)
+        if table is None:
+            continue
+        if table not in counts:
+            counts[table] = table_row_count(conn, table)
+        total += counts[table]
+    return total
+
+
+def profiled_execute(conn, sql, params=(), nl_question=None, rewrite=None, log_path=SLOW_LOG_PATH,
+                     slow_steps=SLOW_STEPS, slow_ms=SLOW_MS, max_entries=MAX_LOG_ENTRIES):
+    """Execute sql on conn, returning its rows and logging it if it was slow.
+
+    rewrite, if given, is called as rewrite(sql, conn) and the statement it
+    returns is what runs (e.g. fts_index.rewrite_like_to_match). The log keeps
+    the original sql and its shape; the statement actually run is in traced_sql.
+    """
+    executed = rewrite(sql, conn) if rewrite else sql
+    traced = []
+    steps = [0]
+
+    def on_progress():
+        steps[0] += PROGRESS_INTERVAL
+        return 0
+
+    conn.set_trace_callback(traced.append)
+    conn.set_progress_handler(on_progress, PROGRESS_INTERVAL)
+    try:
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        cursor.execute(executed, params)
+        results = cursor.fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        conn.set_trace_callback(None)
+        conn.set_progress_handler(None, PROGRESS_INTERVAL)
+
+    if steps[0] >= slow_steps or elapsed_ms >= slow_ms:
+        # Plan and scan estimate are only worth their cost for logged entries.
+        plan_rows, plan_text = explain_query_plan(conn, executed, params)
+        log_conn = init_slow_log(log_path)
+        log_conn.execute("""
+            INSERT INTO slow_queries (logged_at, nl_question, sql_text, sql_shape, traced_sql,
+                                      vm_steps, elapsed_ms, rows_scanned, rows_returned, query_plan)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            datetime.now().isoformat(timespec="seconds"), nl_question, sql, normalize_sql(sql),
+            "\n".join(traced), steps[0], elapsed_ms, estimate_rows_scanned(conn, executed, plan_rows),
+            len(results), plan_text,
+        ))
+        log_conn.execute("DELETE FROM slow_queries WHERE id <= (SELECT MAX(id) FROM slow_queries) - ?",
+                         (max_entries,))
+        log_conn.commit()
+        log_conn.close()
+
+    return results
+
+
+def slow_query_report(log_path=SLOW_LOG_PATH, limit=20):
+    conn = init_slow_log(log_path)
+    rows = conn.execute("""
+        SELECT sql_shape, COUNT(*), AVG(vm_steps), MAX(vm_steps), AVG(elapsed_ms),
+               MAX(elapsed_ms), AVG(rows_scanned), AVG(rows_returned),
+               (SELECT nl_question FROM slow_queries s2
+                WHERE s2.sql_shape = s1.sql_shape ORDER BY s2.vm_steps DESC LIMIT 1),
+               (SELECT query_plan FROM slow_queries s2
+                WHERE s2.sql_shape = s1.sql_shape ORDER BY s2.vm_steps DESC LIMIT 1)
+        FROM slow_queries s1
+        GROUP BY sql_shape
+        ORDER BY SUM(vm_steps) DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+    conn.close()
+    return rows
+
+
+def print_report(rows):
+    if not rows:
+        print("No slow queries logged.")
+        return
+    for (shape, count, avg_steps, max_steps, avg_ms, max_ms,
+         avg_scanned, avg_returned, question, plan) in rows:
+        print(f"[{count}x] {shape}")
+        print(f"    steps avg {avg_steps:,.0f} / max {max_steps:,}  "
+              f"time avg {avg_ms:.1f} ms / max {max_ms:.1f} ms  "
+              f"rows scanned ~{avg_scanned or 0:,.0f} / returned {avg_returned:,.0f}")
+        if question:
+            print(f"    question: {question}")
+        for line in (plan or "").splitlines():
+            print(f"    | {line}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report slow generated SQL grouped by statement shape.")
+    parser.add_argument("--log", default=SLOW_LOG_PATH, help="slow query log database")
+    parser.add_argument("--limit", type=int, default=20, help="number of statement shapes to show")
+    parser.add_argument("--clear", action="store_true", help="empty the log after printing the report")
+    args = parser.parse_args()
+
+    print_report(slow_query_report(args.log, args.limit))
+    if args.clear:
+        conn = init_slow_log(args.log)
+        conn.execute("DELETE FROM slow_queries")
+        conn.commit()
+        conn.close()
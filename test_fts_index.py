@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+
+from fts_index import create_fts_indexes, drop_fts_indexes, indexed_tables, rewrite_like_to_match
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE Customers (
+            CustomerID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name TEXT NOT NULL,
+            Email TEXT UNIQUE,
+            City TEXT
+        );
+
+        CREATE TABLE Reviews (
+            ReviewID INTEGER PRIMARY KEY AUTOINCREMENT,
+            CustomerID INTEGER,
+            ProductID INTEGER,
+            Rating INTEGER CHECK (Rating BETWEEN 1 AND 5),
+            Comment TEXT
+        );
+    """)
+    names = ["Bob Smith", "Jane Smithers", "Alice Johnson", "Tom Brown"] + [f"Customer_{i}" for i in range(40)]
+    conn.executemany("INSERT INTO Customers (Name, City) VALUES (?, ?)", [(n, "Boston") for n in names])
+    comments = ["Poor quality.", "qual'ity is fine", None, "Broke after a week."] + ["Great product!"] * 40
+    conn.executemany("INSERT INTO Reviews (CustomerID, Rating, Comment) VALUES (?, ?, ?)",
+                     [(i % len(names) + 1, i % 5 + 1, c) for i, c in enumerate(comments)])
+    create_fts_indexes(conn, ["Customers", "Reviews"])
+    yield conn
+    conn.close()
+
+
+def run(conn, sql):
+    return sorted(conn.execute(sql).fetchall(), key=repr)
+
+
+def assert_rewritten(conn, sql):
+    rewritten = rewrite_like_to_match(sql, conn)
+    assert rewritten != sql
+    assert "MATCH" in rewritten
+    assert run(conn, rewritten) == run(conn, sql)
+
+
+def assert_untouched(conn, sql):
+    assert rewrite_like_to_match(sql, conn) == sql
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM Reviews WHERE Comment LIKE '%quality%'",
+    "SELECT * FROM Reviews WHERE Rating > 1 AND (Comment LIKE '%QUALITY%' OR Comment LIKE '%broke%');",
+    "SELECT c.Name, r.Comment FROM Reviews r JOIN Customers c ON c.CustomerID = r.CustomerID "
+    "WHERE r.Comment LIKE '%quality%' OR c.Name LIKE '%smith%'",
+    "SELECT c.Name FROM Customers c LEFT JOIN Reviews r ON r.CustomerID = c.CustomerID "
+    "AND r.Comment LIKE '%quality%' WHERE c.Name LIKE '%Smith%' ORDER BY c.Name",
+    "SELECT * FROM Customers AS cu WHERE cu.Name LIKE 'Bob Sm%' LIMIT 5",
+    "SELECT * FROM Reviews WHERE Comment LIKE '%qual''ity%'",
+    "SELECT * FROM Customers WHERE instr(Name, 'Smith') > 0",
+    "SELECT * FROM Customers WHERE instr(Name, 'Smith') != 0",
+    "SELECT * FROM Reviews WHERE Rating BETWEEN 1 AND 5 AND Comment LIKE '%quality%'",
+    "SELECT * FROM Reviews WHERE (Rating > 1 AND (Rating < 5 OR Comment LIKE '%quality%'))",
+    "SELECT r.Comment, c.Name FROM Reviews r, Customers c "
+    "WHERE c.CustomerID = r.CustomerID AND c.Name LIKE '%Smith%'",
+])
+def test_rewrite_returns_same_rows(conn, sql):
+    assert_rewritten(conn, sql)
+
+
+@pytest.mark.parametrize("sql", [
+    # Subqueries, derived tables and CTEs: the table may not be in scope.
+    "SELECT * FROM (SELECT Name FROM Customers) sub WHERE Name LIKE '%Smith%'",
+    "WITH x AS (SELECT Comment FROM Reviews) SELECT * FROM x WHERE Comment LIKE '%quality%'",
+    "SELECT * FROM Customers WHERE CustomerID IN (SELECT CustomerID FROM Reviews WHERE Comment LIKE '%quality%')",
+    # instr() used as a position rather than a containment test.
+    "SELECT instr(Name, 'Smith') AS pos FROM Customers",
+    "SELECT * FROM Customers WHERE instr(Name, 'Smith') = 1",
+    "SELECT * FROM Customers WHERE instr(Name, 'ers') > 5",
+    # NOT, value contexts and operators binding tighter than the predicate.
+    "SELECT * FROM Reviews WHERE NOT (Comment LIKE '%quality%')",
+    "SELECT * FROM Reviews WHERE NOT (Rating > 5 OR Comment LIKE '%quality%')",
+    "SELECT * FROM Reviews WHERE NOT (Rating < 5 AND Comment LIKE '%quality%')",
+    "SELECT * FROM Reviews WHERE Rating > 0 AND NOT (Rating > 5 OR (Comment LIKE '%quality%'))",
+    "SELECT * FROM Reviews WHERE (Rating > 5 OR Comment LIKE '%quality%') IS NOT TRUE",
+    "SELECT * FROM Reviews WHERE coalesce(Rating > 5 OR Comment LIKE '%quality%', 1)",
+    "SELECT * FROM Reviews WHERE Comment NOT LIKE '%quality%'",
+    "SELECT Comment LIKE '%quality%' FROM Reviews",
+    "SELECT * FROM Reviews WHERE Comment LIKE 'Poor' || '%'",
+    "SELECT * FROM Reviews WHERE Comment LIKE '%quality%' COLLATE NOCASE",
+    "SELECT * FROM Reviews WHERE (Comment LIKE '%quality%') = 0",
+    "SELECT * FROM Reviews WHERE CASE WHEN Comment LIKE '%quality%' THEN 1 END",
+    "SELECT * FROM Reviews r WHERE r.Comment LIKE '%qual''ity%' ESCAPE '!'",
+    # Nothing the index can look up, or a term in most rows.
+    "SELECT * FROM Reviews WHERE Comment LIKE '%qu%'",
+    "SELECT * FROM Reviews WHERE Comment LIKE '%Great product%'",
+    # Only looks like a predicate inside a literal or comment.
+    "SELECT 'Name LIKE ''%Smith%''' FROM Customers",
+    "SELECT * FROM Customers -- WHERE Name LIKE '%Smith%'",
+])
+def test_ineligible_sql_is_untouched(conn, sql):
+    assert_untouched(conn, sql)
+    run(conn, sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM Reviews NOT INDEXED WHERE Comment LIKE '%quality%'",
+    "SELECT * FROM Reviews INDEXED BY idx_reviews_rating WHERE Comment LIKE '%quality%'",
+    "SELECT * FROM Reviews AS r NOT INDEXED WHERE r.Comment LIKE '%quality%'",
+])
+def test_pinned_plans_come_back_valid(conn, sql):
+    conn.execute("CREATE INDEX idx_reviews_rating ON Reviews (Rating)")
+    assert run(conn, rewrite_like_to_match(sql, conn)) == run(conn, sql)
+
+
+def test_triggers_keep_index_in_sync(conn):
+    sql = "SELECT Name FROM Customers WHERE Name LIKE '%Okafor%'"
+    conn.execute("INSERT INTO Customers (Name) VALUES ('Ada Okafor')")
+    conn.execute("UPDATE Customers SET Name = 'Ben Okafor' WHERE Name = 'Tom Brown'")
+    assert run(conn, rewrite_like_to_match(sql, conn)) == [("Ada Okafor",), ("Ben Okafor",)]
+
+    conn.execute("DELETE FROM Customers WHERE Name = 'Ada Okafor'")
+    assert run(conn, rewrite_like_to_match(sql, conn)) == [("Ben Okafor",)]
+
+
+def test_no_rewrite_without_indexes(conn):
+    drop_fts_indexes(conn)
+    assert indexed_tables(conn) == []
+    assert_untouched(conn, "SELECT * FROM Reviews WHERE Comment LIKE '%quality%'")
@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+
+from fts_index import create_fts_indexes, rewrite_like_to_match
+from query_profiler import init_slow_log, normalize_sql, print_report, profiled_execute, slow_query_report
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE Customers (
+            CustomerID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name TEXT NOT NULL,
+            City TEXT
+        );
+
+        CREATE TABLE Reviews (
+            ReviewID INTEGER PRIMARY KEY AUTOINCREMENT,
+            CustomerID INTEGER,
+            Rating INTEGER,
+            Comment TEXT
+        );
+
+        CREATE INDEX idx_reviews_rating ON Reviews (Rating);
+    """)
+    conn.executemany("INSERT INTO Customers (Name, City) VALUES (?, ?)", [(f"Customer_{i}", "Boston") for i in range(50)])
+    conn.executemany("INSERT INTO Reviews (CustomerID, Rating, Comment) VALUES (?, ?, ?)",
+                     [(i % 50 + 1, i % 5 + 1, "Poor quality." if i % 40 == 0 else "Great product!") for i in range(200)])
+    yield conn
+    conn.close()
+
+
+def logged(log_path):
+    log = init_slow_log(log_path)
+    log.row_factory = sqlite3.Row
+    rows = log.execute("SELECT * FROM slow_queries ORDER BY id").fetchall()
+    log.close()
+    return rows
+
+
+def test_normalize_sql_keeps_comment_markers_inside_literals():
+    assert normalize_sql("SELECT * FROM t WHERE a = 'a--b' AND b = 2 -- note") == "SELECT * FROM T WHERE A = ? AND B = ?"
+    assert normalize_sql("SELECT * FROM t WHERE a IN (1, 2, 3) /* it's */") == "SELECT * FROM T WHERE A IN (?)"
+
+
+def test_parameterized_statement_gets_plan(conn, tmp_path):
+    log_path = tmp_path / "slow.db"
+    profiled_execute(conn, "SELECT * FROM Reviews WHERE Comment = ?", ("Poor quality.",),
+                     log_path=log_path, slow_steps=0)
+    entry = logged(log_path)[0]
+    assert entry["query_plan"] == "SCAN Reviews"
+    assert entry["rows_scanned"] == 200
+
+
+def test_aliased_and_index_scans_are_counted(conn, tmp_path):
+    log_path = tmp_path / "slow.db"
+    profiled_execute(conn, "SELECT r.Rating, COUNT(*) FROM Reviews r JOIN Customers c "
+                           "ON c.CustomerID = r.CustomerID GROUP BY r.Rating",
+                     log_path=log_path, slow_steps=0)
+    entry = logged(log_path)[0]
+    # Reviews is scanned through its covering Rating index; Customers is searched by key.
+    assert "SCAN r USING" in entry["query_plan"]
+    assert entry["rows_scanned"] == 200
+
+
+def test_rewritten_statement_logs_original_sql(conn, tmp_path):
+    create_fts_indexes(conn, ["Reviews"])
+    log_path = tmp_path / "slow.db"
+    sql = "SELECT * FROM Reviews WHERE Comment LIKE '%quality%'"
+    results = profiled_execute(conn, sql, rewrite=rewrite_like_to_match, log_path=log_path, slow_steps=0)
+    entry = logged(log_path)[0]
+    assert len(results) == 5
+    assert entry["sql_text"] == sql
+    assert entry["sql_shape"] == normalize_sql(sql)
+    assert "MATCH" in entry["traced_sql"]
+    assert entry["rows_scanned"] == 0
+
+
+def test_log_rotates_to_max_entries(conn, tmp_path):
+    log_path = tmp_path / "slow.db"
+    for rating in range(1, 6):
+        profiled_execute(conn, f"SELECT * FROM Reviews WHERE Rating = {rating}", nl_question=f"rating {rating}",
+                         log_path=log_path, slow_steps=0, max_entries=3)
+    entries = logged(log_path)
+    # The oldest entries are dropped first.
+    assert [e["nl_question"] for e in entries] == ["rating 3", "rating 4", "rating 5"]
+
+
+def test_report_groups_by_shape(conn, tmp_path, capsys):
+    log_path = tmp_path / "slow.db"
+    for rating in (1, 2, 3):
+        profiled_execute(conn, f"SELECT * FROM Reviews WHERE Rating = {rating}", log_path=log_path, slow_steps=0)
+    profiled_execute(conn, "SELECT Name FROM Customers WHERE City = 'Boston'", nl_question="who is in Boston",
+                     log_path=log_path, slow_steps=0)
+
+    groups = {row[0]: row for row in slow_query_report(log_path)}
+    assert groups.keys() == {"SELECT * FROM REVIEWS WHERE RATING = ?", "SELECT NAME FROM CUSTOMERS WHERE CITY = ?"}
+    reviews = groups["SELECT * FROM REVIEWS WHERE RATING = ?"]
+    customers = groups["SELECT NAME FROM CUSTOMERS WHERE CITY = ?"]
+    assert reviews[1] == 3
+    assert customers[1] == 1
+    assert customers[7] == 50
+    assert customers[8] == "who is in Boston"
+
+    print_report(slow_query_report(log_path))
+    out = capsys.readouterr().out
+    assert "[3x] SELECT * FROM REVIEWS WHERE RATING = ?" in out
+    assert "[1x] SELECT NAME FROM CUSTOMERS WHERE CITY = ?" in out
+    assert "question: who is in Boston" in out